@@ -1,8 +1,8 @@
 # config.py
 import os
 import json
-from dataclasses import dataclass, asdict
-from typing import Optional
+from dataclasses import dataclass, asdict, field
+from typing import List, Optional
 
 CONFIG_FILENAME = ".pubg_encoder_config.json"
 
@@ -31,18 +31,110 @@ DEFAULT_FFMPEG_TEMPLATE = """\
 """
 
 
+DEFAULT_PREVIEW_TEMPLATE = """\
+-vf scale=-2:720
+-c:v h264_nvenc
+-preset p5
+-profile:v high
+-rc vbr
+-cq 28
+-c:a aac
+-b:a 128k
+"""
+
+ARCHIVE_RENDITION_NAME = "archive"
+ARCHIVE_TAG = "HEVC_P7"
+ARCHIVE_OUTPUT_DIR = "HEVC_P7_Converted"
+
+
+@dataclass
+class Rendition:
+    """
+    One named output of a job. All renditions of a job are written by a
+    single ffmpeg invocation, so the input is read and decoded once.
+    """
+    name: str
+    template: str
+    tag: str  # output name suffix, see build_output_name
+    output_dir: str  # sub-folder of the input folder
+
+
+def default_extra_renditions() -> List[Rendition]:
+    return [
+        Rendition(
+            name="preview",
+            template=DEFAULT_PREVIEW_TEMPLATE,
+            tag="H264_PREVIEW",
+            output_dir="H264_Preview",
+        ),
+    ]
+
+
 @dataclass
 class Config:
     ffmpeg_path: str = DEFAULT_FFMPEG_PATH
     ffprobe_path: Optional[str] = None
     max_parallel_jobs: int = 3
     ffmpeg_template: str = DEFAULT_FFMPEG_TEMPLATE
+    # Early abort of unprofitable encodes: after `abort_warmup_sec` seconds of
+    # encoded output, project the final size; if it exceeds
+    # `abort_size_ratio` * input size, stop the encode.
+    # `abort_policy` is "keep" (leave the original only) or "copy"
+    # (copy the original through as the output). Ratio <= 0 disables it.
+    abort_warmup_sec: float = 60.0
+    abort_size_ratio: float = 0.9
+    abort_policy: str = "keep"
+    # Per-file classification from the probed video stream (see
+    # job_classifier.py). Inputs already in `classify_target_codec` with an
+    # accepted profile and at most `classify_max_remux_bpp` bits per pixel
+    # get `classify_target_action` ("remux" or "skip"); other codecs below
+    # `classify_min_encode_bpp` are skipped as not worth re-encoding.
+    classify_target_codec: str = "hevc"
+    classify_remux_profiles: str = "Main,Main 10"
+    classify_max_remux_bpp: float = 0.10
+    classify_min_encode_bpp: float = 0.03
+    classify_target_action: str = "remux"
+    # Inputs with identical content are encoded once. Duplicates either get
+    # a hard link to the representative's output ("link") or are skipped.
+    duplicate_policy: str = "link"
+    # Additional outputs written alongside the archive in the same ffmpeg run
+    extra_renditions: List[Rendition] = field(default_factory=default_extra_renditions)
+    # Inputs classified for remux are normally only stream-copied (seconds).
+    # Producing the extra renditions for them too means a full decode and
+    # encode, so it is opt-in.
+    remux_extra_renditions: bool = False
+    # Folder restored from its saved job list at startup
+    last_folder: Optional[str] = None
 
     def ensure_paths(self):
         if not self.ffprobe_path:
             folder = os.path.dirname(self.ffmpeg_path)
             self.ffprobe_path = os.path.join(folder, "ffprobe.exe")
 
+    def renditions(self) -> List[Rendition]:
+        """
+        All outputs of a job; the archive (ffmpeg_template) always comes first.
+        """
+        archive = Rendition(
+            name=ARCHIVE_RENDITION_NAME,
+            template=self.ffmpeg_template,
+            tag=ARCHIVE_TAG,
+            output_dir=ARCHIVE_OUTPUT_DIR,
+        )
+        return [archive] + list(self.extra_renditions)
+
+
+def load_renditions(data: dict) -> List[Rendition]:
+    if "extra_renditions" not in data:
+        return default_extra_renditions()
+    renditions = []
+    for item in data["extra_renditions"] or []:
+        try:
+            renditions.append(Rendition(**item))
+        except TypeError:
+            continue
+    return renditions
+
 
 def load_config() -> Config:
     path = get_config_path()
@@ -59,6 +151,18 @@ def load_config() -> Config:
             ffprobe_path=data.get("ffprobe_path"),
             max_parallel_jobs=int(data.get("max_parallel_jobs", 3)),
             ffmpeg_template=data.get("ffmpeg_template", DEFAULT_FFMPEG_TEMPLATE),
+            abort_warmup_sec=float(data.get("abort_warmup_sec", 60.0)),
+            abort_size_ratio=float(data.get("abort_size_ratio", 0.9)),
+            abort_policy=data.get("abort_policy", "keep"),
+            classify_target_codec=data.get("classify_target_codec", "hevc"),
+            classify_remux_profiles=data.get("classify_remux_profiles", "Main,Main 10"),
+            classify_max_remux_bpp=float(data.get("classify_max_remux_bpp", 0.10)),
+            classify_min_encode_bpp=float(data.get("classify_min_encode_bpp", 0.03)),
+            classify_target_action=data.get("classify_target_action", "remux"),
+            duplicate_policy=data.get("duplicate_policy", "link"),
+            extra_renditions=load_renditions(data),
+            remux_extra_renditions=bool(data.get("remux_extra_renditions", False)),
+            last_folder=data.get("last_folder"),
         )
         cfg.ensure_paths()
         return cfg
@@ -3,22 +3,22 @@ import os
 from typing import List
 
 
-def build_output_name(input_filename: str) -> str:
+def build_output_name(input_filename: str, tag: str = "HEVC_P7") -> str:
     """
     Convert:
         PLAYERUNKNOWN'S BATTLEGROUNDS  2019-11-21 19-40-36.mp4
     to:
-        PUBG_2019-11-21_19-40-36_HEVC_P7.mp4
+        PUBG_2019-11-21_19-40-36_<tag>.mp4
     """
     name, _ = os.path.splitext(input_filename)
     parts = name.split()
 
     if len(parts) < 2:
-        return "PUBG_%s_HEVC_P7.mp4" % name.replace(" ", "_")
+        return "PUBG_%s_%s.mp4" % (name.replace(" ", "_"), tag)
 
     date_part = parts[-2]
     time_part = parts[-1]
-    new_name = "PUBG_%s_%s_HEVC_P7.mp4" % (date_part, time_part)
+    new_name = "PUBG_%s_%s_%s.mp4" % (date_part, time_part, tag)
     return new_name
 
 
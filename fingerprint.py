@@ -0,0 +1,143 @@
+# fingerprint.py
+import os
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+SAMPLE_BLOCK_SIZE = 1024 * 1024  # 1 MiB per sampled block
+SAMPLE_OFFSETS = (0.0, 0.25, 0.5, 0.75, 1.0)  # fractions of the file size
+FULL_HASH_CHUNK = 8 * 1024 * 1024
+
+
+def sample_fingerprint(file_path: str, size: int) -> str:
+    """
+    Cheap content fingerprint: file size plus a SHA-1 of a few
+    fixed-offset blocks. Returns "" on failure.
+    """
+    h = hashlib.sha1()
+    h.update(str(size).encode("ascii"))
+    try:
+        with open(file_path, "rb", buffering=SAMPLE_BLOCK_SIZE) as f:
+            last = max(size - SAMPLE_BLOCK_SIZE, 0)
+            for frac in SAMPLE_OFFSETS:
+                f.seek(min(int(size * frac), last))
+                h.update(f.read(SAMPLE_BLOCK_SIZE))
+    except OSError:
+        return ""
+    return "%d:%s" % (size, h.hexdigest())
+
+
+def full_hash(file_path: str) -> str:
+    """
+    SHA-256 of the whole file. Returns "" on failure.
+    """
+    h = hashlib.sha256()
+    try:
+        with open(file_path, "rb", buffering=FULL_HASH_CHUNK) as f:
+            while True:
+                chunk = f.read(FULL_HASH_CHUNK)
+                if not chunk:
+                    break
+                h.update(chunk)
+    except OSError:
+        return ""
+    return h.hexdigest()
+
+
+def compute_fingerprints(sizes: Dict[str, int], max_workers: int = 8,
+                         progress: Optional[Callable[[int, int], None]] = None) -> Dict[str, str]:
+    """
+    Fingerprint several files in parallel.
+    `sizes` maps file path -> size; returns file path -> fingerprint.
+    `progress(done, total)` is called after each file.
+    """
+    paths = list(sizes)
+    if not paths:
+        return {}
+    results = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        for path, fp in zip(paths, pool.map(lambda p: sample_fingerprint(p, sizes[p]), paths)):
+            results[path] = fp
+            if progress:
+                progress(len(results), len(paths))
+    return results
+
+
+def compute_full_hashes(paths: List[str], max_workers: int = 4,
+                        progress: Optional[Callable[[int, int], None]] = None) -> Dict[str, str]:
+    if not paths:
+        return {}
+    results = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        for path, digest in zip(paths, pool.map(full_hash, paths)):
+            results[path] = digest
+            if progress:
+                progress(len(results), len(paths))
+    return results
+
+
+def group_by_key(keys: Dict[str, str]) -> List[List[str]]:
+    """
+    Group paths sharing the same non-empty key.
+    Only groups with more than one member are returned, each sorted.
+    """
+    groups = {}  # type: dict[str, list[str]]
+    for path, key in keys.items():
+        if key:
+            groups.setdefault(key, []).append(path)
+    return [sorted(g) for g in groups.values() if len(g) > 1]
+
+
+def find_duplicates(folder_path: str, fnames: List[str], stats: Dict[str, tuple],
+                    cache, progress: Optional[Callable[[str, int, int], None]] = None
+                    ) -> Dict[str, str]:
+    """
+    Detect duplicate inputs in `folder_path`.
+    `stats` maps file name -> (size, mtime); `cache` is a ProbeCache whose
+    entries hold the sampled fingerprint and, after a collision, the full hash.
+    Returns duplicate file name -> representative file name (the first
+    name in sorted order of each group).
+    `progress(stage, done, total)` reports the sampling and hashing passes.
+    """
+    fingerprints = {}  # type: dict[str, str]
+    to_sample = {}  # type: dict[str, int]
+    for fname in fnames:
+        size, mtime = stats[fname]
+        entry = cache.get(fname, size, mtime)
+        if entry and entry.get("fingerprint"):
+            fingerprints[fname] = entry["fingerprint"]
+        else:
+            to_sample[os.path.join(folder_path, fname)] = size
+
+    sample_progress = (lambda done, total: progress("fingerprinting", done, total)) if progress else None
+    for path, fp in compute_fingerprints(to_sample, progress=sample_progress).items():
+        fname = os.path.basename(path)
+        size, mtime = stats[fname]
+        fingerprints[fname] = fp
+        cache.update(fname, size, mtime, fingerprint=fp)
+
+    # Confirm fingerprint collisions with a full hash
+    candidates = [f for group in group_by_key(fingerprints) for f in group]
+    hashes = {}  # type: dict[str, str]
+    to_hash = []
+    for fname in candidates:
+        size, mtime = stats[fname]
+        entry = cache.get(fname, size, mtime)
+        if entry and entry.get("full_hash"):
+            hashes[fname] = entry["full_hash"]
+        else:
+            to_hash.append(os.path.join(folder_path, fname))
+
+    hash_progress = (lambda done, total: progress("hashing", done, total)) if progress else None
+    for path, digest in compute_full_hashes(to_hash, progress=hash_progress).items():
+        fname = os.path.basename(path)
+        size, mtime = stats[fname]
+        hashes[fname] = digest
+        cache.update(fname, size, mtime, full_hash=digest)
+
+    duplicates = {}  # type: dict[str, str]
+    for group in group_by_key(hashes):
+        representative = group[0]
+        for fname in group[1:]:
+            duplicates[fname] = representative
+    return duplicates
@@ -20,14 +20,16 @@ from PyQt6.QtWidgets import (
     QGroupBox,
 )
 
-from config import Config, save_config
-from model import EncoderJob
+import startup_profile
+from config import Config, save_config, ARCHIVE_RENDITION_NAME
+from model import EncoderJob, STATUS_NOT_WORTH_IT
 from ffmpeg_template import build_output_name
-from duration_probe import probe_duration
-from gpu_monitor import get_gpu_temperature
 from logging_utils import append_log
-from workers import EncoderWorker
-from gui_settings import SettingsDialog
+from job_state import save_job_state, load_job_state
+
+# Probe, telemetry and worker subsystems (ffprobe/nvidia-smi wrappers,
+# fingerprinting, QThread workers) are imported where first used so the
+# window can paint before they load.
 
 
 def format_hms(seconds: float) -> str:
@@ -54,12 +56,14 @@ class MainWindow(QMainWindow):
         self.jobs = []          # type: list[EncoderJob]
         self.workers = {}       # type: dict[int, EncoderWorker]
         self.active_jobs = 0
+        self.scan_worker = None  # type: Optional[ScanWorker]
 
         self._build_ui()
 
-        self.info_timer = QTimer(self)
-        self.info_timer.timeout.connect(self.update_info_panel)
-        self.info_timer.start(1000)
+        self.info_timer = None  # type: Optional[QTimer]
+
+        # Everything else runs once the event loop is up and the window painted
+        QTimer.singleShot(0, self.finish_startup)
 
     def _build_ui(self):
         central = QWidget()
@@ -70,8 +74,8 @@ class MainWindow(QMainWindow):
         # Top controls
         top_layout = QHBoxLayout()
         self.folder_label = QLabel("Folder: (none selected)")
-        btn_select = QPushButton("Select Folder...")
-        btn_select.clicked.connect(self.select_folder)
+        self.btn_select = QPushButton("Select Folder...")
+        self.btn_select.clicked.connect(self.select_folder)
 
         btn_settings = QPushButton("Settings")
         btn_settings.clicked.connect(self.open_settings)
@@ -81,20 +85,21 @@ class MainWindow(QMainWindow):
         self.btn_start.setEnabled(False)
 
         top_layout.addWidget(self.folder_label, stretch=1)
-        top_layout.addWidget(btn_select)
+        top_layout.addWidget(self.btn_select)
         top_layout.addWidget(btn_settings)
         top_layout.addWidget(self.btn_start)
 
         main_layout.addLayout(top_layout)
 
         # Table
-        self.table = QTableWidget(0, 4)
-        self.table.setHorizontalHeaderLabels(["File", "Status", "Progress", "ETA"])
+        self.table = QTableWidget(0, 5)
+        self.table.setHorizontalHeaderLabels(["File", "Status", "Progress", "ETA", "Decision"])
         header = self.table.horizontalHeader()
         header.setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
         header.setSectionResizeMode(1, QHeaderView.ResizeMode.ResizeToContents)
         header.setSectionResizeMode(2, QHeaderView.ResizeMode.ResizeToContents)
         header.setSectionResizeMode(3, QHeaderView.ResizeMode.ResizeToContents)
+        header.setSectionResizeMode(4, QHeaderView.ResizeMode.ResizeToContents)
         main_layout.addWidget(self.table, stretch=1)
 
         # Info panel
@@ -111,6 +116,69 @@ class MainWindow(QMainWindow):
         info_layout.addWidget(self.label_queue)
         main_layout.addWidget(info_box)
 
+    # ---------- Startup ----------
+
+    def finish_startup(self):
+        startup_profile.mark("event loop running, window shown")
+
+        folder = self.cfg.last_folder
+        if folder and os.path.isdir(folder):
+            self.restore_folder(folder)
+            startup_profile.mark("restore last folder")
+
+        startup_profile.report()
+
+    def start_telemetry(self):
+        """
+        Start polling nvidia-smi and refreshing ETAs; only needed while encoding.
+        """
+        if self.info_timer is None:
+            self.info_timer = QTimer(self)
+            self.info_timer.timeout.connect(self.update_info_panel)
+        if not self.info_timer.isActive():
+            self.info_timer.start(1000)
+
+    def stop_telemetry(self):
+        if self.info_timer is not None:
+            self.info_timer.stop()
+        self.update_queue_panel()
+
+    def restore_folder(self, folder: str):
+        """
+        Show the job list saved for `folder` without probing or hashing;
+        falls back to a full scan if the saved state is missing or stale.
+        """
+        self.folder_path = folder
+        self.folder_label.setText("Folder: %s" % folder)
+
+        jobs = load_job_state(folder, self.rendition_paths_for)
+        if jobs is None:
+            self.scan_folder()
+            return
+
+        self.ensure_output_dirs()
+
+        self._reset_jobs()
+        for job in jobs:
+            self.jobs.append(job)
+            self._add_job_row(job)
+        self.btn_start.setEnabled(bool(self.jobs))
+        self.update_queue_panel()
+        append_log(self.folder_path, "Restored %d jobs from saved state." % len(self.jobs))
+
+    def rendition_paths_for(self, fname: str) -> dict:
+        """
+        Output path of every configured rendition for input `fname`.
+        """
+        return {
+            r.name: os.path.join(self.folder_path, r.output_dir, build_output_name(fname, r.tag))
+            for r in self.cfg.renditions()
+        }
+
+    def ensure_output_dirs(self):
+        for rendition in self.cfg.renditions():
+            os.makedirs(os.path.join(self.folder_path, rendition.output_dir), exist_ok=True)
+
     # ---------- UI Actions ----------
 
     def select_folder(self):
@@ -119,19 +187,55 @@ class MainWindow(QMainWindow):
             return
         self.folder_path = folder
         self.folder_label.setText("Folder: %s" % folder)
+        self.cfg.last_folder = folder
+        save_config(self.cfg)
         self.scan_folder()
 
-    def scan_folder(self):
+    def _reset_jobs(self):
         self.jobs = []
         self.workers = {}
         self.active_jobs = 0
         self.table.setRowCount(0)
 
+    def _add_job_row(self, job: EncoderJob):
+        row = self.table.rowCount()
+        self.table.insertRow(row)
+
+        item_file = QTableWidgetItem(os.path.basename(job.input_path))
+        item_file.setFlags(item_file.flags() & ~Qt.ItemFlag.ItemIsEditable)
+
+        item_status = QTableWidgetItem(job.status)
+        item_status.setFlags(item_status.flags() & ~Qt.ItemFlag.ItemIsEditable)
+
+        progress_bar = QProgressBar()
+        progress_bar.setRange(0, 100)
+        progress_bar.setValue(int(job.progress * 100))
+
+        item_eta = QTableWidgetItem("--:--")
+        item_eta.setFlags(item_eta.flags() & ~Qt.ItemFlag.ItemIsEditable)
+
+        item_decision = QTableWidgetItem("%s: %s" % (job.action.capitalize(), job.action_reason))
+        item_decision.setFlags(item_decision.flags() & ~Qt.ItemFlag.ItemIsEditable)
+
+        self.table.setItem(row, 0, item_file)
+        self.table.setItem(row, 1, item_status)
+        self.table.setCellWidget(row, 2, progress_bar)
+        self.table.setItem(row, 3, item_eta)
+        self.table.setItem(row, 4, item_decision)
+
+    def scan_folder(self):
+        """
+        List and stat the inputs, then hand fingerprinting, hashing and
+        probing to a ScanWorker; on_scan_finished builds the job list.
+        """
+        from workers import ScanWorker
+
+        self._reset_jobs()
+
         if not self.folder_path:
             return
 
-        out_dir = os.path.join(self.folder_path, "HEVC_P7_Converted")
-        os.makedirs(out_dir, exist_ok=True)
+        self.ensure_output_dirs()
 
         mp4_files = [
             f for f in os.listdir(self.folder_path)
@@ -144,63 +248,186 @@ class MainWindow(QMainWindow):
             return
 
         mp4_files.sort()
+
+        stats = {}  # type: dict[str, tuple]
+        for fname in mp4_files:
+            try:
+                st = os.stat(os.path.join(self.folder_path, fname))
+                stats[fname] = (st.st_size, st.st_mtime)
+            except OSError:
+                stats[fname] = (0, 0.0)
+
+        self.btn_start.setEnabled(False)
+        self.btn_select.setEnabled(False)
+        self.label_queue.setText("Scanning %d files..." % len(mp4_files))
+
+        # Parented to the window and only released once the thread has
+        # really finished, never from its own result signal
+        self.scan_worker = ScanWorker(self.folder_path, mp4_files, stats, self.cfg, parent=self)
+        self.scan_worker.progress_signal.connect(self.on_scan_progress)
+        self.scan_worker.finished_signal.connect(self.on_scan_finished)
+        self.scan_worker.finished.connect(self.on_scan_thread_finished)
+        self.scan_worker.start()
+
+    def on_scan_progress(self, stage: str, done: int, total: int):
+        self.label_queue.setText("Scanning: %s %d/%d" % (stage, done, total))
+
+    def on_scan_thread_finished(self):
+        worker = self.sender()
+        if worker is self.scan_worker:
+            self.scan_worker = None
+        worker.deleteLater()
+
+    def on_scan_finished(self, result: dict):
+        from job_classifier import classify_stream, ACTION_ENCODE, ACTION_REMUX, ACTION_SKIP
+
+        mp4_files = result["fnames"]
+        stats = result["stats"]
+        self.btn_select.setEnabled(True)
+
+        duplicates = result["duplicates"]
+        verdicts = result["not_worth_it"]
+        index_by_name = {fname: idx for idx, fname in enumerate(mp4_files)}
+
         for idx, fname in enumerate(mp4_files):
             input_path = os.path.join(self.folder_path, fname)
-            output_name = build_output_name(fname)
-            output_path = os.path.join(out_dir, output_name)
-
-            duration = probe_duration(self.cfg.ffprobe_path, input_path)
+            rendition_paths = self.rendition_paths_for(fname)
+            output_path = rendition_paths[ARCHIVE_RENDITION_NAME]
+            pending = [name for name, path in rendition_paths.items() if not os.path.exists(path)]
+            size, mtime = stats[fname]
+
+            duplicate_of = None
+            if fname in duplicates:
+                # Same content as an earlier file; only the representative is encoded
+                representative = duplicates[fname]
+                duplicate_of = index_by_name[representative]
+                duration = self.jobs[duplicate_of].duration
+                action, reason = ACTION_SKIP, "duplicate of %s" % representative
+            else:
+                info, duration = result["probes"][fname]
+                action, reason = classify_stream(info, self.cfg)
+                if fname in verdicts:
+                    # An earlier run already projected no archive savings for this
+                    # exact file; only the other renditions are still produced
+                    pending = [name for name in pending if name != ARCHIVE_RENDITION_NAME]
+                    action = ACTION_ENCODE if pending else ACTION_SKIP
+                    reason = "archive not worth it (projected %d of %d bytes)" % (verdicts[fname], size)
+                elif action == ACTION_REMUX and not self.cfg.remux_extra_renditions:
+                    # Keep remuxes a pure stream copy
+                    pending = [name for name in pending if name == ARCHIVE_RENDITION_NAME]
+                    reason += ", archive only"
 
             job = EncoderJob(
                 index=idx,
                 input_path=input_path,
                 output_path=output_path,
                 duration=duration,
+                input_size=size,
+                input_mtime=mtime,
+                action=action,
+                action_reason=reason,
+                duplicate_of=duplicate_of,
+                rendition_paths=rendition_paths,
+                pending_renditions=pending,
+            )
+
+            append_log(
+                self.folder_path,
+                "CLASSIFY: %s action=%s reason=%s" % (input_path, action, reason),
             )
 
-            if os.path.exists(output_path):
+            if not pending and action != ACTION_SKIP:
                 job.status = "Skipped (exists)"
                 job.progress = 1.0
+            elif action == ACTION_SKIP:
+                job.status = "Skipped (%s)" % reason
+                job.progress = 1.0
             else:
                 job.status = "Pending"
                 job.progress = 0.0
 
             self.jobs.append(job)
+            self._add_job_row(job)
 
-            row = self.table.rowCount()
-            self.table.insertRow(row)
-
-            item_file = QTableWidgetItem(os.path.basename(input_path))
-            item_file.setFlags(item_file.flags() & ~Qt.ItemFlag.ItemIsEditable)
+        for job in self.jobs:
+            if job.duplicate_of is None:
+                self.link_duplicates(job)
 
-            item_status = QTableWidgetItem(job.status)
-            item_status.setFlags(item_status.flags() & ~Qt.ItemFlag.ItemIsEditable)
+        self.save_state()
 
-            progress_bar = QProgressBar()
-            progress_bar.setRange(0, 100)
-            progress_bar.setValue(int(job.progress * 100))
+        self.btn_start.setEnabled(True)
+        self.update_queue_panel()
+        append_log(
+            self.folder_path,
+            "Scan completed. %d files found, %d duplicates." % (len(self.jobs), len(duplicates)),
+        )
 
-            item_eta = QTableWidgetItem("--:--")
-            item_eta.setFlags(item_eta.flags() & ~Qt.ItemFlag.ItemIsEditable)
+    def save_state(self):
+        if not save_job_state(self.folder_path, self.jobs):
+            append_log(self.folder_path, "WARNING: could not save job state; next start will rescan.")
 
-            self.table.setItem(row, 0, item_file)
-            self.table.setItem(row, 1, item_status)
-            self.table.setCellWidget(row, 2, progress_bar)
-            self.table.setItem(row, 3, item_eta)
+    def record_not_worth_it(self, job: EncoderJob):
+        """
+        Remember the abort verdict in the probe cache so later scans skip
+        the file instead of spending another warm-up on it.
+        """
+        from probe_cache import ProbeCache
 
-        self.btn_start.setEnabled(True)
-        append_log(self.folder_path, "Scan completed. %d files found." % len(self.jobs))
+        try:
+            st = os.stat(job.input_path)
+        except OSError:
+            return
+        cache = ProbeCache(self.folder_path)
+        cache.load()
+        cache.update(
+            os.path.basename(job.input_path), st.st_size, st.st_mtime,
+            not_worth_it=True,
+            projected_size=job.projected_size,
+        )
+        cache.save()
+
+    def link_duplicates(self, job: EncoderJob, names: Optional[list] = None):
+        """
+        Give every duplicate of `job` its own outputs by hard-linking the
+        representative's outputs (duplicate_policy == "link"). `names`
+        restricts this to renditions just verified by a run; otherwise any
+        existing output is used, which is safe because workers only move
+        complete outputs to their final names.
+        """
+        if self.cfg.duplicate_policy != "link":
+            return
+        for dup in self.jobs:
+            if dup.duplicate_of != job.index:
+                continue
+            for name, dup_path in dup.rendition_paths.items():
+                if names is not None and name not in names:
+                    continue
+                src_path = job.rendition_paths.get(name)
+                if not src_path or not os.path.exists(src_path) or os.path.exists(dup_path):
+                    continue
+                try:
+                    os.link(src_path, dup_path)
+                    result = "linked"
+                except OSError as e:
+                    result = "link failed (%s)" % e
+                append_log(
+                    self.folder_path,
+                    "DUPLICATE: %s -> %s %s" % (dup_path, src_path, result),
+                )
 
     def start_encoding(self):
         if not self.jobs:
             return
         self.btn_start.setEnabled(False)
         append_log(self.folder_path, "Encoding started.")
+        self.start_telemetry()
         self.start_next_jobs()
 
     # ---------- Settings ----------
 
     def open_settings(self):
+        from gui_settings import SettingsDialog
+
         dlg = SettingsDialog(self, self.cfg)
         if dlg.exec():
             self.cfg.ffmpeg_template = dlg.get_template()
@@ -223,22 +450,33 @@ class MainWindow(QMainWindow):
             self.launch_job(next_job)
 
         if self.active_jobs == 0 and not self.get_next_pending_job():
+            self.stop_telemetry()
             append_log(self.folder_path, "All encodes completed.")
             QMessageBox.information(self, "Done", "All encodes completed.")
 
     def launch_job(self, job: EncoderJob):
-        job.status = "Encoding"
+        from workers import EncoderWorker, run_status
+
+        job.status = run_status(job)
         row = job.index
         self.table.item(row, 1).setText(job.status)
+        job.start_time = time.time()
 
         append_log(
             self.folder_path,
-            "START: %s -> %s (duration=%.2fs)" % (job.input_path, job.output_path, job.duration),
+            "START: %s -> %s (action=%s, duration=%.2fs)"
+            % (
+                job.input_path,
+                ", ".join(job.rendition_paths[name] for name in job.pending_renditions),
+                job.action,
+                job.duration,
+            ),
         )
 
         worker = EncoderWorker(job, self.cfg)
         worker.progress_signal.connect(self.on_job_progress)
         worker.status_signal.connect(self.on_job_status)
+        worker.result_signal.connect(self.on_job_result)
         worker.finished_signal.connect(self.on_job_finished)
         self.workers[job.index] = worker
 
@@ -263,6 +501,11 @@ class MainWindow(QMainWindow):
         row = job.index
         self.table.item(row, 1).setText(status)
 
+    def on_job_result(self, job_index: int, result: dict):
+        job = self.jobs[job_index]
+        for name, value in result.items():
+            setattr(job, name, value)
+
     def on_job_finished(self, job_index: int, success: bool):
         job = self.jobs[job_index]
         self.active_jobs = max(0, self.active_jobs - 1)
@@ -271,11 +514,41 @@ class MainWindow(QMainWindow):
         if job.start_time is not None:
             elapsed = time.time() - job.start_time
 
-        append_log(
-            self.folder_path,
-            "END: %s status=%s elapsed=%.1fs"
-            % (job.input_path, "OK" if success else "FAIL", elapsed),
-        )
+        if job.status == STATUS_NOT_WORTH_IT:
+            ratio = job.projected_size / job.input_size if job.input_size > 0 else 0.0
+            append_log(
+                self.folder_path,
+                "ABORT: %s not worth it at %.1fs/%.1fs: projected=%d bytes, "
+                "input=%d bytes (%.2f > %.2f), policy=%s, elapsed=%.1fs"
+                % (
+                    job.input_path,
+                    job.abort_position_sec,
+                    job.duration,
+                    job.projected_size,
+                    job.input_size,
+                    ratio,
+                    self.cfg.abort_size_ratio,
+                    job.abort_result,
+                    elapsed,
+                ),
+            )
+            self.record_not_worth_it(job)
+        else:
+            append_log(
+                self.folder_path,
+                "END: %s status=%s elapsed=%.1fs"
+                % (job.input_path, "OK" if success else "FAIL", elapsed),
+            )
+        for name, ok in job.output_ok.items():
+            append_log(
+                self.folder_path,
+                "  OUTPUT %s: %s %s" % (name, job.rendition_paths.get(name, ""), "OK" if ok else "FAIL"),
+            )
+
+        if job.duplicate_of is None:
+            self.link_duplicates(job, [name for name, ok in job.output_ok.items() if ok])
+
+        self.save_state()
 
         # Set ETA to 00:00 on finish
         eta_item = self.table.item(job.index, 3)
@@ -287,14 +560,21 @@ class MainWindow(QMainWindow):
     # ---------- Info panel / ETA / GPU ----------
 
     def update_info_panel(self):
+        from gpu_monitor import get_gpu_temperature
+
         # GPU temp
         gpu_temp = get_gpu_temperature()
         self.label_gpu.setText("GPU: %s" % gpu_temp)
 
+        self.update_queue_panel()
+
+    def update_queue_panel(self):
         total_remaining = 0.0
         pending_count = 0
         encoding_count = 0
         done_count = 0
+        partial_count = 0
+        failed_count = 0
 
         now = time.time()
 
@@ -309,7 +589,7 @@ class MainWindow(QMainWindow):
                 if eta_item:
                     eta_item.setText(format_hms(job.duration))
 
-            elif job.status == "Encoding":
+            elif job.status in ("Encoding", "Remuxing"):
                 encoding_count += 1
                 if job.start_time is not None and job.progress > 0.0:
                     elapsed = now - job.start_time
@@ -322,13 +602,17 @@ class MainWindow(QMainWindow):
                     eta_item.setText(format_hms(remaining))
 
             else:
-                if job.status.startswith("Skipped") or job.status == "Done":
+                if job.status.startswith("Skipped") or job.status in ("Done", STATUS_NOT_WORTH_IT):
                     done_count += 1
+                elif job.status.startswith("Partial"):
+                    partial_count += 1
+                elif job.status.startswith("Failed"):
+                    failed_count += 1
                 if eta_item and eta_item.text() in ("--:--", ""):
                     eta_item.setText("00:00")
 
         self.label_overall_eta.setText("Total ETA: %s" % format_hms(total_remaining))
         self.label_queue.setText(
-            "Queue: %d pending, %d encoding, %d done"
-            % (pending_count, encoding_count, done_count)
+            "Queue: %d pending, %d encoding, %d done, %d partial, %d failed"
+            % (pending_count, encoding_count, done_count, partial_count, failed_count)
         )
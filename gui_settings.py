@@ -24,7 +24,8 @@ class SettingsDialog(QDialog):
             "Edit the FFmpeg encoding template.\n"
             "Lines are split into arguments. Empty lines and lines starting with # are ignored.\n"
             "The program will run:\n"
-            "  ffmpeg -y -i <input>  [template args]  -progress pipe:1 -nostats -loglevel error <output>\n"
+            "  ffmpeg -y -i <input> -progress pipe:1 -nostats -loglevel error  [template args] <output>\n"
+            "followed by [args] <output> for each extra rendition (extra_renditions in the config file).\n"
         )
         layout.addWidget(label)
 
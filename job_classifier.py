@@ -0,0 +1,54 @@
+# job_classifier.py
+from typing import Optional, Tuple
+
+from config import Config
+from stream_probe import StreamInfo
+
+ACTION_ENCODE = "encode"
+ACTION_REMUX = "remux"
+ACTION_SKIP = "skip"
+
+
+def _split_profiles(profiles: str) -> list:
+    return [p.strip().lower() for p in profiles.split(",") if p.strip()]
+
+
+def classify_stream(info: Optional[StreamInfo], cfg: Config) -> Tuple[str, str]:
+    """
+    Decide what to do with an input based on its probed video stream.
+    Returns (action, reason), where action is one of
+    ACTION_ENCODE, ACTION_REMUX or ACTION_SKIP.
+
+    Rules, first match wins:
+      * probe failed                                  -> encode
+      * target codec, allowed profile, bpp <= max     -> cfg.classify_target_action
+      * target codec otherwise                        -> encode
+      * other codec with bpp below the encode minimum -> skip
+      * anything else                                 -> encode
+    """
+    if info is None or not info.codec_name:
+        return ACTION_ENCODE, "probe failed"
+
+    codec = info.codec_name.lower()
+    bpp = info.bits_per_pixel
+    target = cfg.classify_target_codec.lower()
+
+    if codec == target:
+        profiles = _split_profiles(cfg.classify_remux_profiles)
+        if profiles and info.profile.lower() not in profiles:
+            return ACTION_ENCODE, "%s profile '%s' not accepted" % (codec, info.profile)
+        if bpp <= 0:
+            return ACTION_ENCODE, "%s with unknown bitrate" % codec
+        if bpp > cfg.classify_max_remux_bpp:
+            return ACTION_ENCODE, "%s at %.3f bpp > %.3f" % (
+                codec, bpp, cfg.classify_max_remux_bpp)
+        action = cfg.classify_target_action
+        if action not in (ACTION_REMUX, ACTION_SKIP):
+            action = ACTION_REMUX
+        return action, "already %s at %.3f bpp" % (codec, bpp)
+
+    if 0 < bpp < cfg.classify_min_encode_bpp:
+        return ACTION_SKIP, "%s at %.3f bpp < %.3f" % (
+            codec, bpp, cfg.classify_min_encode_bpp)
+
+    return ACTION_ENCODE, "%s at %.3f bpp" % (codec, bpp)
@@ -0,0 +1,88 @@
+# job_state.py
+import os
+import json
+from dataclasses import asdict
+from typing import Callable, Dict, List, Optional
+
+from model import EncoderJob
+from config import ARCHIVE_RENDITION_NAME
+
+STATE_FILENAME = ".job_state.json"
+
+
+def get_state_path(folder_path: str) -> str:
+    return os.path.join(folder_path, STATE_FILENAME)
+
+
+def save_job_state(folder_path: str, jobs: List[EncoderJob]) -> bool:
+    """
+    Must be called from the GUI thread, which owns the jobs.
+    Returns False if the state could not be written.
+    """
+    path = get_state_path(folder_path)
+    try:
+        data = [asdict(job) for job in jobs]
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=1)
+        return True
+    except Exception:
+        return False
+
+
+def load_job_state(folder_path: str,
+                   rendition_paths_for: Callable[[str], Dict[str, str]]
+                   ) -> Optional[List[EncoderJob]]:
+    """
+    Restore the job list saved by the last scan of `folder_path`.
+    `rendition_paths_for(file name)` gives the output paths the current
+    configuration expects for an input.
+    Returns None if there is no usable state, any saved output path differs
+    from the expected ones (renditions, tags or output folders changed), or
+    the folder's .mp4 inputs differ from the saved set (added, removed, or
+    changed size/mtime); the caller should rescan then.
+    """
+    path = get_state_path(folder_path)
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        jobs = [EncoderJob(**item) for item in data]
+    except Exception:
+        return None
+
+    try:
+        current = sorted(f for f in os.listdir(folder_path) if f.lower().endswith(".mp4"))
+    except OSError:
+        return None
+    if current != sorted(os.path.basename(job.input_path) for job in jobs):
+        return None
+
+    for job in jobs:
+        try:
+            st = os.stat(job.input_path)
+        except OSError:
+            return None
+        if st.st_size != job.input_size or st.st_mtime != job.input_mtime:
+            return None
+        expected = rendition_paths_for(os.path.basename(job.input_path))
+        if job.rendition_paths != expected:
+            return None
+        if job.output_path != expected.get(ARCHIVE_RENDITION_NAME):
+            return None
+        job.start_time = None
+        # Runs interrupted by closing the app start over
+        if job.status in ("Encoding", "Remuxing"):
+            job.status = "Pending"
+            job.progress = 0.0
+            job.last_position_sec = 0.0
+            job.output_ok = {}
+        if job.status == "Pending":
+            job.pending_renditions = [
+                name for name in job.pending_renditions
+                if not os.path.exists(job.rendition_paths.get(name, ""))
+            ]
+            if not job.pending_renditions:
+                job.status = "Skipped (exists)"
+                job.progress = 1.0
+    return jobs
@@ -1,21 +1,36 @@
 # main.py
 import sys
 
-from PyQt6.QtWidgets import QApplication
-
-from config import load_config
-from theme import apply_dark_theme
-from gui_main import MainWindow
+import startup_profile
+from startup_profile import timed
 
 
 def main():
-    app = QApplication(sys.argv)
-
-    cfg = load_config()
-    win = MainWindow(cfg)
-    apply_dark_theme(app)
-
-    win.show()
+    if "--profile-startup" in sys.argv:
+        sys.argv.remove("--profile-startup")
+        startup_profile.enable()
+
+    # Imports are timed individually so --profile-startup shows their cost
+    with timed("import PyQt6.QtWidgets"):
+        from PyQt6.QtWidgets import QApplication
+    with timed("import config, theme"):
+        from config import load_config
+        from theme import apply_dark_theme
+    with timed("import gui_main"):
+        from gui_main import MainWindow
+
+    with timed("QApplication()"):
+        app = QApplication(sys.argv)
+
+    with timed("load_config()"):
+        cfg = load_config()
+    with timed("MainWindow()"):
+        win = MainWindow(cfg)
+    with timed("apply_dark_theme()"):
+        apply_dark_theme(app)
+
+    with timed("show()"):
+        win.show()
     sys.exit(app.exec())
 
 
@@ -1,15 +1,31 @@
 # model.py
 from dataclasses import dataclass, field
-from typing import Optional
+from typing import Dict, List, Optional
+
+STATUS_NOT_WORTH_IT = "Not worth it"
 
 
 @dataclass
 class EncoderJob:
     index: int
     input_path: str
-    output_path: str
+    output_path: str  # archive rendition
     duration: float = 0.0  # seconds
     status: str = "Pending"
     progress: float = 0.0  # 0..1
     start_time: Optional[float] = None
     last_position_sec: float = 0.0  # last encoded time in seconds
+    input_size: int = 0  # bytes
+    input_mtime: float = 0.0  # input mtime at scan time, to detect changed inputs
+    projected_size: int = 0  # projected output size in bytes (0 = unknown)
+    abort_position_sec: float = 0.0  # encoded time at which the archive was abandoned
+    abort_result: str = ""  # what the abort policy did, see EncoderWorker.finish_not_worth_it
+    action: str = "encode"  # encode / remux / skip, see job_classifier.py
+    action_reason: str = ""
+    duplicate_of: Optional[int] = None  # index of the job with identical content
+    # Output path of every rendition (see Config.renditions), archive included
+    rendition_paths: Dict[str, str] = field(default_factory=dict)
+    # Renditions still to produce, written by one ffmpeg run
+    pending_renditions: List[str] = field(default_factory=list)
+    # Per-rendition result after the run: rendition name -> success
+    output_ok: Dict[str, bool] = field(default_factory=dict)
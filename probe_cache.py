@@ -0,0 +1,88 @@
+# probe_cache.py
+import os
+import json
+from dataclasses import asdict
+from typing import Optional
+
+from duration_probe import probe_duration
+from stream_probe import StreamInfo, probe_stream_info
+
+CACHE_FILENAME = ".probe_cache.json"
+
+
+def get_cache_path(folder_path: str) -> str:
+    return os.path.join(folder_path, CACHE_FILENAME)
+
+
+class ProbeCache:
+    """
+    Per-folder cache of probe results, keyed by file name.
+    An entry is only returned while the file's size and mtime still match.
+    """
+
+    def __init__(self, folder_path: str):
+        self.folder_path = folder_path
+        self.entries = {}  # type: dict[str, dict]
+        self.dirty = False
+
+    def load(self):
+        path = get_cache_path(self.folder_path)
+        if not os.path.exists(path):
+            return
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if isinstance(data, dict):
+                self.entries = data
+        except Exception:
+            self.entries = {}
+
+    def save(self):
+        if not self.dirty:
+            return
+        path = get_cache_path(self.folder_path)
+        try:
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(self.entries, f, indent=1)
+            self.dirty = False
+        except Exception:
+            # Cache is an optimisation only; a failed save just means a slower next scan
+            pass
+
+    def get(self, fname: str, size: int, mtime: float) -> Optional[dict]:
+        entry = self.entries.get(fname)
+        if not entry:
+            return None
+        if entry.get("size") != size or entry.get("mtime") != mtime:
+            return None
+        return entry
+
+    def update(self, fname: str, size: int, mtime: float, **values):
+        entry = self.get(fname, size, mtime)
+        if entry is None:
+            entry = {"size": size, "mtime": mtime}
+            self.entries[fname] = entry
+        entry.update(values)
+        self.dirty = True
+
+
+def probe_cached(cache: ProbeCache, ffprobe_path: str, folder_path: str,
+                 fname: str, size: int, mtime: float):
+    """
+    Return (StreamInfo or None, duration), probing only on a cache miss.
+    Only successful probes are cached, so a failure (e.g. a wrong
+    ffprobe_path) is retried on the next scan.
+    """
+    entry = cache.get(fname, size, mtime)
+    if entry is not None and entry.get("stream") and entry.get("duration", 0.0) > 0:
+        return StreamInfo(**entry["stream"]), float(entry["duration"])
+
+    input_path = os.path.join(folder_path, fname)
+    info = probe_stream_info(ffprobe_path, input_path)
+    if info is not None and info.duration > 0:
+        duration = info.duration
+    else:
+        duration = probe_duration(ffprobe_path, input_path)
+    if info is not None and duration > 0:
+        cache.update(fname, size, mtime, stream=asdict(info), duration=duration)
+    return info, duration
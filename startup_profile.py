@@ -0,0 +1,51 @@
+# startup_profile.py
+import sys
+import time
+from contextlib import contextmanager
+
+_start = time.perf_counter()
+_last = _start
+_marks = []  # type: list[tuple[str, float, float]]
+enabled = False
+
+
+def enable():
+    global enabled
+    enabled = True
+
+
+def mark(label: str):
+    """
+    Record the time spent since the previous mark under `label`.
+    """
+    global _last
+    now = time.perf_counter()
+    _marks.append((label, now - _last, now - _start))
+    _last = now
+
+
+@contextmanager
+def timed(label: str):
+    """
+    Record the time spent inside the block under `label`.
+    """
+    global _last
+    _last = time.perf_counter()
+    try:
+        yield
+    finally:
+        mark(label)
+
+
+def report(stream=None):
+    """
+    Print the startup breakdown collected so far (only with --profile-startup).
+    """
+    if not enabled:
+        return
+    stream = stream or sys.stderr
+    stream.write("Startup profile (ms):\n")
+    stream.write("  %-40s %10s %10s\n" % ("step", "step", "total"))
+    for label, step, total in _marks:
+        stream.write("  %-40s %10.1f %10.1f\n" % (label, step * 1000.0, total * 1000.0))
+    stream.flush()
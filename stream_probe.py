@@ -0,0 +1,111 @@
+# stream_probe.py
+import json
+import subprocess
+from dataclasses import dataclass
+from typing import Optional
+
+
+@dataclass
+class StreamInfo:
+    codec_name: str = ""
+    profile: str = ""
+    width: int = 0
+    height: int = 0
+    fps: float = 0.0
+    bit_rate: int = 0  # bits per second, video stream (falls back to container)
+    duration: float = 0.0  # seconds
+
+    @property
+    def bits_per_pixel(self) -> float:
+        pixels_per_sec = self.width * self.height * self.fps
+        if pixels_per_sec <= 0 or self.bit_rate <= 0:
+            return 0.0
+        return self.bit_rate / pixels_per_sec
+
+
+def _parse_rate(value: str) -> float:
+    try:
+        if "/" in value:
+            num, den = value.split("/", 1)
+            den_f = float(den)
+            return float(num) / den_f if den_f else 0.0
+        return float(value)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def _to_int(value) -> int:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return 0
+
+
+def parse_stream_info(data: dict) -> Optional[StreamInfo]:
+    """
+    Build a StreamInfo from ffprobe's JSON output
+    (-show_entries stream=...:format=... -of json).
+    Returns None if there is no video stream.
+    """
+    streams = data.get("streams") or []
+    fmt = data.get("format") or {}
+    video = [s for s in streams if s.get("codec_type") == "video"]
+    if not video:
+        return None
+    stream = video[0]
+
+    fps = _parse_rate(stream.get("avg_frame_rate", ""))
+    if fps <= 0:
+        # avg_frame_rate is "0/0" when ffprobe cannot average it (e.g. no
+        # duration in the stream header); r_frame_rate is the best guess then
+        fps = _parse_rate(stream.get("r_frame_rate", ""))
+
+    bit_rate = _to_int(stream.get("bit_rate"))
+    if bit_rate <= 0:
+        # Containers like MKV carry no per-stream bitrate; the container
+        # bitrate also counts audio, so take out what the audio reports
+        bit_rate = _to_int(fmt.get("bit_rate"))
+        for other in streams:
+            if other.get("codec_type") == "audio":
+                bit_rate -= _to_int(other.get("bit_rate"))
+        bit_rate = max(bit_rate, 0)
+
+    try:
+        duration = float(fmt.get("duration", 0.0))
+    except (TypeError, ValueError):
+        duration = 0.0
+
+    return StreamInfo(
+        codec_name=stream.get("codec_name", "") or "",
+        profile=stream.get("profile", "") or "",
+        width=_to_int(stream.get("width")),
+        height=_to_int(stream.get("height")),
+        fps=fps,
+        bit_rate=bit_rate,
+        duration=duration,
+    )
+
+
+def probe_stream_info(ffprobe_path: str, file_path: str) -> Optional[StreamInfo]:
+    """
+    Use ffprobe to get codec, profile, geometry, frame rate, bitrate and
+    duration of the first video stream.
+    Returns None on failure.
+    """
+    try:
+        cmd = [
+            ffprobe_path,
+            "-v", "error",
+            "-show_entries",
+            "stream=codec_type,codec_name,profile,width,height,"
+            "avg_frame_rate,r_frame_rate,bit_rate"
+            ":format=duration,bit_rate",
+            "-of", "json",
+            file_path,
+        ]
+        output = subprocess.check_output(
+            cmd, stderr=subprocess.DEVNULL, text=True
+        )
+        return parse_stream_info(json.loads(output))
+    except Exception:
+        return None
@@ -0,0 +1,161 @@
+# tests/test_job_classifier.py
+import shutil
+import subprocess
+
+import pytest
+
+from config import Config
+from job_classifier import classify_stream, ACTION_ENCODE, ACTION_REMUX, ACTION_SKIP
+from stream_probe import StreamInfo, parse_stream_info, probe_stream_info
+
+FFMPEG = shutil.which("ffmpeg")
+FFPROBE = shutil.which("ffprobe")
+
+
+# ---------- parse_stream_info (no ffmpeg needed) ----------
+
+def test_parse_uses_stream_bitrate_and_avg_frame_rate():
+    info = parse_stream_info({
+        "streams": [{
+            "codec_type": "video", "codec_name": "hevc", "profile": "Main 10",
+            "width": 1920, "height": 1080,
+            "avg_frame_rate": "60000/1001", "r_frame_rate": "60/1",
+            "bit_rate": "8000000",
+        }],
+        "format": {"duration": "12.5", "bit_rate": "9000000"},
+    })
+    assert info.profile == "Main 10"
+    assert info.fps == pytest.approx(59.94, abs=0.01)
+    assert info.bit_rate == 8_000_000
+    assert info.duration == 12.5
+
+
+def test_parse_zero_avg_frame_rate_falls_back_to_r_frame_rate():
+    info = parse_stream_info({
+        "streams": [{
+            "codec_type": "video", "codec_name": "h264",
+            "width": 320, "height": 240,
+            "avg_frame_rate": "0/0", "r_frame_rate": "30/1",
+            "bit_rate": "100000",
+        }],
+        "format": {},
+    })
+    assert info.fps == 30.0
+    assert info.bits_per_pixel > 0
+
+
+def test_parse_missing_stream_bitrate_subtracts_audio_from_container():
+    info = parse_stream_info({
+        "streams": [
+            {"codec_type": "video", "codec_name": "h264", "width": 320,
+             "height": 240, "avg_frame_rate": "30/1"},
+            {"codec_type": "audio", "codec_name": "aac", "bit_rate": "128000"},
+        ],
+        "format": {"bit_rate": "1128000"},
+    })
+    assert info.bit_rate == 1_000_000
+
+
+def test_parse_without_video_stream():
+    assert parse_stream_info({"streams": [{"codec_type": "audio"}], "format": {}}) is None
+
+
+def test_classify_probe_failure_encodes():
+    assert classify_stream(None, Config())[0] == ACTION_ENCODE
+
+
+def test_classify_target_action_skip():
+    cfg = Config(classify_target_action=ACTION_SKIP)
+    info = StreamInfo("hevc", "Main", 1920, 1080, 60.0, 6_000_000, 10.0)
+    assert classify_stream(info, cfg)[0] == ACTION_SKIP
+
+
+# ---------- real clips generated with lavfi ----------
+
+needs_ffmpeg = pytest.mark.skipif(
+    not (FFMPEG and FFPROBE), reason="ffmpeg/ffprobe not on PATH"
+)
+
+
+def _make_clip(path, video_args, container_args=()):
+    cmd = [
+        FFMPEG, "-y", "-v", "error",
+        "-f", "lavfi", "-i", "testsrc=size=320x240:rate=30:duration=2",
+        "-f", "lavfi", "-i", "sine=frequency=440:duration=2",
+        "-shortest",
+    ]
+    cmd.extend(video_args)
+    cmd.extend(["-c:a", "aac", "-b:a", "64k"])
+    cmd.extend(container_args)
+    cmd.append(str(path))
+    try:
+        subprocess.run(cmd, check=True)
+    except subprocess.CalledProcessError:
+        pytest.skip("ffmpeg cannot encode with %s" % " ".join(video_args))
+    return str(path)
+
+
+@pytest.fixture(scope="module")
+def clips(tmp_path_factory):
+    if not (FFMPEG and FFPROBE):
+        pytest.skip("ffmpeg/ffprobe not on PATH")
+    d = tmp_path_factory.mktemp("clips")
+    return {
+        "h264": _make_clip(d / "h264.mp4", ["-c:v", "libx264", "-b:v", "500k"]),
+        "hevc_main": _make_clip(d / "hevc.mp4", [
+            "-c:v", "libx265", "-b:v", "100k", "-pix_fmt", "yuv420p",
+            "-x265-params", "log-level=error"]),
+        "hevc_main10": _make_clip(d / "hevc10.mp4", [
+            "-c:v", "libx265", "-b:v", "100k", "-pix_fmt", "yuv420p10le",
+            "-x265-params", "log-level=error"]),
+        "h264_mkv": _make_clip(d / "h264.mkv", ["-c:v", "libx264", "-b:v", "500k"]),
+    }
+
+
+@needs_ffmpeg
+def test_probe_real_clips(clips):
+    h264 = probe_stream_info(FFPROBE, clips["h264"])
+    assert h264.codec_name == "h264"
+    assert (h264.width, h264.height) == (320, 240)
+    assert h264.fps == pytest.approx(30.0)
+    assert h264.bit_rate > 0
+    assert h264.duration == pytest.approx(2.0, abs=0.2)
+
+    assert probe_stream_info(FFPROBE, clips["hevc_main"]).profile == "Main"
+    assert probe_stream_info(FFPROBE, clips["hevc_main10"]).profile == "Main 10"
+
+
+@needs_ffmpeg
+def test_probe_mkv_without_stream_bitrate(clips):
+    info = probe_stream_info(FFPROBE, clips["h264_mkv"])
+    assert info.bit_rate > 0
+    assert info.bits_per_pixel > 0
+
+
+@needs_ffmpeg
+def test_classify_hevc_remux(clips):
+    cfg = Config(classify_max_remux_bpp=10.0)
+    for name in ("hevc_main", "hevc_main10"):
+        action, reason = classify_stream(probe_stream_info(FFPROBE, clips[name]), cfg)
+        assert action == ACTION_REMUX, reason
+
+
+@needs_ffmpeg
+def test_classify_hevc_over_bpp_limit_encodes(clips):
+    cfg = Config(classify_max_remux_bpp=0.0001)
+    action, _ = classify_stream(probe_stream_info(FFPROBE, clips["hevc_main"]), cfg)
+    assert action == ACTION_ENCODE
+
+
+@needs_ffmpeg
+def test_classify_hevc_profile_not_accepted_encodes(clips):
+    cfg = Config(classify_max_remux_bpp=10.0, classify_remux_profiles="Main")
+    action, _ = classify_stream(probe_stream_info(FFPROBE, clips["hevc_main10"]), cfg)
+    assert action == ACTION_ENCODE
+
+
+@needs_ffmpeg
+def test_classify_h264(clips):
+    info = probe_stream_info(FFPROBE, clips["h264"])
+    assert classify_stream(info, Config(classify_min_encode_bpp=0.0001))[0] == ACTION_ENCODE
+    assert classify_stream(info, Config(classify_min_encode_bpp=10.0))[0] == ACTION_SKIP
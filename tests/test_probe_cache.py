@@ -0,0 +1,74 @@
+# tests/test_probe_cache.py
+import os
+
+import probe_cache
+from probe_cache import ProbeCache, probe_cached
+from stream_probe import StreamInfo
+from fingerprint import find_duplicates
+
+
+def _stat(path):
+    st = os.stat(path)
+    return st.st_size, st.st_mtime
+
+
+def test_entry_invalidated_by_size_or_mtime(tmp_path):
+    cache = ProbeCache(str(tmp_path))
+    cache.update("a.mp4", 10, 1.0, fingerprint="x")
+    assert cache.get("a.mp4", 10, 1.0)["fingerprint"] == "x"
+    assert cache.get("a.mp4", 11, 1.0) is None
+    assert cache.get("a.mp4", 10, 2.0) is None
+
+
+def test_cache_round_trip(tmp_path):
+    cache = ProbeCache(str(tmp_path))
+    cache.update("a.mp4", 10, 1.5, fingerprint="x")
+    cache.save()
+    loaded = ProbeCache(str(tmp_path))
+    loaded.load()
+    assert loaded.get("a.mp4", 10, 1.5)["fingerprint"] == "x"
+
+
+def test_failed_probe_is_not_cached(tmp_path):
+    (tmp_path / "a.mp4").write_bytes(b"not a video")
+    size, mtime = _stat(tmp_path / "a.mp4")
+    cache = ProbeCache(str(tmp_path))
+
+    missing = str(tmp_path / "no-such-ffprobe")
+    info, duration = probe_cached(cache, missing, str(tmp_path), "a.mp4", size, mtime)
+    assert info is None and duration == 0.0
+    assert cache.get("a.mp4", size, mtime) is None
+
+
+def test_successful_probe_is_cached_and_reused(tmp_path, monkeypatch):
+    (tmp_path / "a.mp4").write_bytes(b"video")
+    size, mtime = _stat(tmp_path / "a.mp4")
+    calls = []
+
+    def fake_probe(ffprobe_path, file_path):
+        calls.append(file_path)
+        return StreamInfo("h264", "High", 320, 240, 30.0, 500_000, 2.0)
+
+    monkeypatch.setattr(probe_cache, "probe_stream_info", fake_probe)
+    cache = ProbeCache(str(tmp_path))
+    first = probe_cached(cache, "ffprobe", str(tmp_path), "a.mp4", size, mtime)
+    second = probe_cached(cache, "ffprobe", str(tmp_path), "a.mp4", size, mtime)
+    assert first == second == (StreamInfo("h264", "High", 320, 240, 30.0, 500_000, 2.0), 2.0)
+    assert len(calls) == 1
+
+
+def test_find_duplicates(tmp_path):
+    data = os.urandom(3 * 1024 * 1024)
+    (tmp_path / "a.mp4").write_bytes(data)
+    (tmp_path / "b.mp4").write_bytes(data)
+    # Same size and sampled blocks except the very last byte
+    (tmp_path / "c.mp4").write_bytes(data[:-1] + bytes([data[-1] ^ 1]))
+    (tmp_path / "d.mp4").write_bytes(b"small")
+
+    fnames = ["a.mp4", "b.mp4", "c.mp4", "d.mp4"]
+    stats = {f: _stat(tmp_path / f) for f in fnames}
+    cache = ProbeCache(str(tmp_path))
+    assert find_duplicates(str(tmp_path), fnames, stats, cache) == {"b.mp4": "a.mp4"}
+    # Fingerprints and full hashes are cached for the colliding files
+    assert cache.get("a.mp4", *stats["a.mp4"])["full_hash"]
+    assert "full_hash" not in cache.get("d.mp4", *stats["d.mp4"])
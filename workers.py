@@ -1,73 +1,200 @@
 # workers.py
 import os
+import copy
+import shutil
 import subprocess
 import time
-from typing import Optional
+from typing import Dict, List, Optional
 
 from PyQt6.QtCore import QThread, pyqtSignal
 
-from model import EncoderJob
-from config import Config
+from model import EncoderJob, STATUS_NOT_WORTH_IT
+from config import Config, ARCHIVE_RENDITION_NAME
 from ffmpeg_template import parse_template_args
+from job_classifier import ACTION_REMUX
+from duration_probe import probe_duration
+from probe_cache import ProbeCache, probe_cached
+from fingerprint import find_duplicates
+
+
+def project_output_size(total_size: int, position_sec: float, duration_sec: float) -> int:
+    """
+    Linearly extrapolate the final output size from the bytes written so far.
+    Returns 0 if there is not enough information.
+    """
+    if total_size <= 0 or position_sec <= 0 or duration_sec <= 0:
+        return 0
+    return int(total_size * (duration_sec / position_sec))
+
+
+def partial_path(path: str) -> str:
+    """
+    Where ffmpeg writes an output until it is verified; only complete
+    outputs ever appear under their final name.
+    """
+    root, ext = os.path.splitext(path)
+    return "%s.partial%s" % (root, ext)
+
+
+def run_status(job: EncoderJob) -> str:
+    """
+    "Remuxing" only when the run is a pure stream copy of the archive;
+    any extra rendition means a full decode and encode.
+    """
+    if job.action == ACTION_REMUX and job.pending_renditions == [ARCHIVE_RENDITION_NAME]:
+        return "Remuxing"
+    return "Encoding"
 
 
 class EncoderWorker(QThread):
     progress_signal = pyqtSignal(int, float, float)  # job_index, progress, position_sec
     status_signal = pyqtSignal(int, str)            # job_index, status
+    result_signal = pyqtSignal(int, object)         # job_index, result fields, before finished
     finished_signal = pyqtSignal(int, bool)         # job_index, success
 
+    # Job fields the worker fills in; reported through result_signal
+    RESULT_FIELDS = (
+        "input_size", "projected_size", "abort_position_sec", "abort_result",
+        "last_position_sec", "output_ok",
+    )
+
     def __init__(self, job: EncoderJob, cfg: Config, parent=None):
         super().__init__(parent)
-        self.job = job
+        # Private copy: the GUI thread owns the real job (and snapshots it
+        # for job_state), so the worker only reports results via signals
+        self.job = copy.deepcopy(job)
         self.cfg = cfg
 
-    def build_command(self) -> list:
+    def finish(self, success: bool):
         job = self.job
-        args = parse_template_args(self.cfg.ffmpeg_template)
+        result = {name: copy.deepcopy(getattr(job, name)) for name in self.RESULT_FIELDS}
+        self.result_signal.emit(job.index, result)
+        self.finished_signal.emit(job.index, success)
+
+    def planned_outputs(self) -> list:
+        """
+        (rendition name, output path, template args) for each output of
+        this run, in Config.renditions order (archive first).
+        """
+        job = self.job
+        pending = job.pending_renditions or [ARCHIVE_RENDITION_NAME]
+        outputs = []
+        for rendition in self.cfg.renditions():
+            if rendition.name not in pending:
+                continue
+            if rendition.name == ARCHIVE_RENDITION_NAME:
+                path = job.output_path
+                if job.action == ACTION_REMUX:
+                    # Stream-copy every stream; no decode/encode needed
+                    args = ["-map", "0", "-c", "copy"]
+                else:
+                    args = parse_template_args(rendition.template)
+            else:
+                path = job.rendition_paths.get(rendition.name)
+                if not path:
+                    continue
+                args = parse_template_args(rendition.template)
+            outputs.append((rendition.name, path, args))
+        return outputs
 
+    def build_command(self, outputs: list) -> list:
+        job = self.job
         cmd = [
             self.cfg.ffmpeg_path,
             "-y",
             "-i",
             job.input_path,
         ]
-        cmd.extend(args)
         # Force progress & logging options (not user-editable, for stability)
         cmd.extend([
             "-progress", "pipe:1",
             "-nostats",
             "-loglevel", "error",
-            job.output_path,
         ])
+        # One output per rendition; ffmpeg decodes the input once and feeds
+        # every output from it
+        for _, path, args in outputs:
+            cmd.extend(args)
+            cmd.append(partial_path(path))
         return cmd
 
     def run(self):
         job = self.job
-        self.status_signal.emit(job.index, "Encoding")
+        self.status_signal.emit(job.index, run_status(job))
         job.start_time = time.time()
 
-        cmd = self.build_command()
+        if job.input_size <= 0:
+            try:
+                job.input_size = os.path.getsize(job.input_path)
+            except OSError:
+                job.input_size = 0
+
+        outputs = self.planned_outputs()
+        returncode, not_worth_it = self.run_ffmpeg(outputs, allow_abort=True)
+        if returncode is None:
+            self.status_signal.emit(job.index, "Failed to start")
+            self.finish(False)
+            return
+
+        if not_worth_it:
+            # The run for the remaining renditions moves last_position_sec on
+            job.abort_position_sec = job.last_position_sec
+            self.remove_partials(outputs)
+            self.apply_abort_policy()
+            # The archive is abandoned, the other renditions are still wanted
+            rest = [o for o in outputs if o[0] != ARCHIVE_RENDITION_NAME]
+            if rest:
+                returncode, _ = self.run_ffmpeg(rest, allow_abort=False)
+                self.collect_outputs(rest, returncode)
+            self.status_signal.emit(job.index, STATUS_NOT_WORTH_IT)
+            self.finish(all(job.output_ok.values()))
+            return
+
+        self.collect_outputs(outputs, returncode)
+        success = bool(job.output_ok) and all(job.output_ok.values())
 
+        if success:
+            self.progress_signal.emit(job.index, 1.0, job.duration)
+            self.status_signal.emit(job.index, "Done")
+        elif any(job.output_ok.values()):
+            failed = [name for name, ok in job.output_ok.items() if not ok]
+            self.status_signal.emit(job.index, "Partial (failed: %s)" % ", ".join(failed))
+        else:
+            self.status_signal.emit(job.index, "Failed")
+
+        self.finish(success)
+
+    def run_ffmpeg(self, outputs: list, allow_abort: bool):
+        """
+        Run one ffmpeg invocation writing `outputs`, reporting progress.
+        Returns (returncode or None if ffmpeg could not start, aborted).
+        """
+        job = self.job
         try:
             process = subprocess.Popen(
-                cmd,
+                self.build_command(outputs),
                 stdout=subprocess.PIPE,
                 stderr=subprocess.STDOUT,
                 universal_newlines=True,
                 bufsize=1,
             )
         except Exception:
-            self.status_signal.emit(job.index, "Failed to start")
-            self.finished_signal.emit(job.index, False)
-            return
+            return None, False
 
         duration_sec = job.duration if job.duration > 0 else None
         position_sec = 0.0
+        total_size = 0
+        aborted = False
 
         if process.stdout is not None:
             for line in process.stdout:
                 line = line.strip()
-                if line.startswith("out_time_ms="):
+                if line.startswith("total_size="):
+                    try:
+                        total_size = int(line.split("=", 1)[1])
+                    except ValueError:
+                        pass
+                elif line.startswith("out_time_ms="):
                     try:
                         ms = int(line.split("=", 1)[1])
                         position_sec = ms / 1_000_000.0
@@ -79,14 +206,139 @@ class EncoderWorker(QThread):
                         self.progress_signal.emit(job.index, progress, position_sec)
                     except ValueError:
                         pass
+                    if allow_abort and self.should_abort(outputs, total_size, position_sec):
+                        aborted = True
+                        process.terminate()
+                        break
 
         process.wait()
-        success = (process.returncode == 0 and os.path.exists(job.output_path))
+        return process.returncode, aborted
 
-        if success:
-            self.progress_signal.emit(job.index, 1.0, job.duration)
-            self.status_signal.emit(job.index, "Done")
-        else:
-            self.status_signal.emit(job.index, "Failed")
+    def output_complete(self, path: str, returncode: int) -> bool:
+        """
+        An output counts as written when it is non-empty and ffprobe sees
+        (nearly) the whole input duration in it. This is judged per file, so
+        one failed rendition does not condemn the others; only without a
+        known duration does ffmpeg's overall exit code decide.
+        """
+        if not os.path.exists(path) or os.path.getsize(path) <= 0:
+            return False
+        if self.job.duration <= 0:
+            return returncode == 0
+        duration = probe_duration(self.cfg.ffprobe_path, path)
+        return duration >= 0.95 * self.job.duration
 
-        self.finished_signal.emit(job.index, success)
+    def collect_outputs(self, outputs: list, returncode: int):
+        """
+        Move complete outputs to their final names and drop the rest.
+        """
+        job = self.job
+        for name, path, _ in outputs:
+            tmp_path = partial_path(path)
+            ok = self.output_complete(tmp_path, returncode)
+            if ok:
+                try:
+                    os.replace(tmp_path, path)
+                except OSError:
+                    ok = False
+            if not ok:
+                self.remove_partials([(name, path, None)])
+            job.output_ok[name] = ok
+
+    def remove_partials(self, outputs: list):
+        for _, path, _ in outputs:
+            try:
+                if os.path.exists(partial_path(path)):
+                    os.remove(partial_path(path))
+            except OSError:
+                pass
+
+    def should_abort(self, outputs: list, total_size: int, position_sec: float) -> bool:
+        """
+        True once the encode has passed the warm-up and its projected
+        output size exceeds the configured fraction of the input size.
+        """
+        job = self.job
+        cfg = self.cfg
+        if job.action == ACTION_REMUX:
+            return False
+        # ffmpeg reports total_size for the first output only, which must be the archive
+        if not outputs or outputs[0][0] != ARCHIVE_RENDITION_NAME:
+            return False
+        if cfg.abort_size_ratio <= 0 or job.input_size <= 0 or job.duration <= 0:
+            return False
+        if position_sec < cfg.abort_warmup_sec:
+            return False
+        job.projected_size = project_output_size(total_size, position_sec, job.duration)
+        if job.projected_size <= 0:
+            return False
+        return job.projected_size > cfg.abort_size_ratio * job.input_size
+
+    def apply_abort_policy(self):
+        """
+        Apply abort_policy to the abandoned archive: keep the original
+        only, or copy it through as the archive output.
+        """
+        job = self.job
+        copied = False
+        job.abort_result = "kept original"
+        if self.cfg.abort_policy == "copy":
+            # Same rule as encoded outputs: only a complete copy gets the final name
+            tmp_path = partial_path(job.output_path)
+            try:
+                shutil.copy2(job.input_path, tmp_path)
+                os.replace(tmp_path, job.output_path)
+                copied = True
+                job.abort_result = "copied"
+            except OSError as e:
+                job.abort_result = "copy failed (%s)" % e
+                self.remove_partials([(ARCHIVE_RENDITION_NAME, job.output_path, None)])
+        job.output_ok[ARCHIVE_RENDITION_NAME] = copied
+
+
+class ScanWorker(QThread):
+    """
+    Fingerprints, hashes and probes the inputs of a folder off the GUI
+    thread. Only the probe cache is touched here; jobs are built by the
+    GUI from the emitted result.
+    """
+    progress_signal = pyqtSignal(str, int, int)  # stage, done, total
+    finished_signal = pyqtSignal(object)         # result dict, see run()
+
+    def __init__(self, folder_path: str, fnames: List[str], stats: Dict[str, tuple],
+                 cfg: Config, parent=None):
+        super().__init__(parent)
+        self.folder_path = folder_path
+        self.fnames = fnames
+        self.stats = stats
+        self.cfg = cfg
+
+    def run(self):
+        cache = ProbeCache(self.folder_path)
+        cache.load()
+
+        duplicates = find_duplicates(
+            self.folder_path, self.fnames, self.stats, cache,
+            progress=self.progress_signal.emit,
+        )
+
+        probes = {}  # type: dict[str, tuple]
+        verdicts = {}  # type: dict[str, int]
+        to_probe = [f for f in self.fnames if f not in duplicates]
+        for done, fname in enumerate(to_probe, 1):
+            size, mtime = self.stats[fname]
+            probes[fname] = probe_cached(
+                cache, self.cfg.ffprobe_path, self.folder_path, fname, size, mtime)
+            entry = cache.get(fname, size, mtime)
+            if entry and entry.get("not_worth_it"):
+                verdicts[fname] = int(entry.get("projected_size", 0))
+            self.progress_signal.emit("probing", done, len(to_probe))
+
+        cache.save()
+        self.finished_signal.emit({
+            "fnames": self.fnames,
+            "stats": self.stats,
+            "duplicates": duplicates,  # duplicate name -> representative name
+            "probes": probes,          # name -> (StreamInfo or None, duration)
+            "not_worth_it": verdicts,  # name -> projected size of the aborted encode
+        })